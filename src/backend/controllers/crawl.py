@@ -1,16 +1,45 @@
+import asyncio
+
 from advanced_alchemy.filters import LimitOffset, OrderBy, SearchFilter
+from advanced_alchemy.types import FileObject
 from litestar import Response, get, post
 from litestar.background_tasks import BackgroundTask
 from litestar.controller import Controller
+from litestar.datastructures import State
 from litestar.di import Provide
-from litestar.exceptions import ValidationException
+from litestar.status_codes import HTTP_202_ACCEPTED
 
+from src.backend import models
 from src.backend.lib.crawl import process_website_crawl
 from src.backend.lib.dependencies import provide_crawl_service
 from src.backend.lib.services import CrawlService
 from src.backend.schema.crawl import Crawl, GetCrawl, PostCrawl
 
 
+async def _sign_file(file: FileObject | None) -> str | None:
+    return await file.sign_async(expires_in=300) if file else None
+
+
+def _build_crawl_schema(crawl: models.Crawl, llms: str | None, llms_full: str | None) -> Crawl:
+    return Crawl(
+        id=crawl.id,
+        website_url=crawl.website_url,
+        url_filters=crawl.url_filters,
+        pages=crawl.pages,
+        status=crawl.status,
+        meta=crawl.meta,
+        created_at=crawl.created_at,
+        updated_at=crawl.updated_at,
+        llms=llms,
+        llms_full=llms_full,
+    )
+
+
+async def _to_crawl_schema(crawl: models.Crawl) -> Crawl:
+    llms, llms_full = await asyncio.gather(_sign_file(crawl.llms), _sign_file(crawl.llms_full))
+    return _build_crawl_schema(crawl, llms, llms_full)
+
+
 class CrawlController(Controller):
     path = "/api/crawl"
     tags = ["Crawl"]
@@ -18,28 +47,20 @@ class CrawlController(Controller):
         "crawl_service": Provide(provide_crawl_service),
     }
 
-    @post("/")
-    async def create_crawl(self, crawl_service: CrawlService, data: PostCrawl) -> Response[Crawl]:
-        if not await data.validate_api_key():
-            raise ValidationException(detail="Invalid Gemini API key")
-
-        crawl = await crawl_service.create(data)
-        crawl = Crawl(
-            id=crawl.id,
-            website_url=crawl.website_url,
-            url_filters=crawl.url_filters,
-            pages=crawl.pages,
-            status=crawl.status,
-            meta=crawl.meta,
-            created_at=crawl.created_at,
-            updated_at=crawl.updated_at,
-            llms=await crawl.llms.sign_async(expires_in=300) if crawl.llms else None,
-            llms_full=await crawl.llms_full.sign_async(expires_in=300) if crawl.llms_full else None,
-        )
+    @post("/", status_code=HTTP_202_ACCEPTED)
+    async def create_crawl(self, state: State, crawl_service: CrawlService, data: PostCrawl) -> Response[Crawl]:
+        # The Gemini API key is checked by the background task, which fails the crawl if it's invalid
+        # A new crawl has no files until the background task writes them, so there is nothing to sign
+        crawl = _build_crawl_schema(await crawl_service.create(data), llms=None, llms_full=None)
 
         return Response(
             content=crawl,
-            background=BackgroundTask(process_website_crawl, data=data, crawl_id=crawl.id),
+            background=BackgroundTask(
+                process_website_crawl,
+                data=data,
+                crawl_id=crawl.id,
+                http_client=state.http_client,
+            ),
         )
 
     @get("/")
@@ -56,20 +77,6 @@ class CrawlController(Controller):
                 OrderBy(field_name="created_at", sort_order="desc"),
             )
 
-        crawls = [
-            Crawl(
-                id=crawl.id,
-                website_url=crawl.website_url,
-                url_filters=crawl.url_filters,
-                pages=crawl.pages,
-                status=crawl.status,
-                meta=crawl.meta,
-                created_at=crawl.created_at,
-                updated_at=crawl.updated_at,
-                llms=await crawl.llms.sign_async(expires_in=300) if crawl.llms else None,
-                llms_full=await crawl.llms_full.sign_async(expires_in=300) if crawl.llms_full else None,
-            )
-            for crawl in crawls
-        ]
+        crawls = await asyncio.gather(*(_to_crawl_schema(crawl) for crawl in crawls))
 
-        return GetCrawl(count=count, crawls=crawls)
+        return GetCrawl(count=count, crawls=list(crawls))
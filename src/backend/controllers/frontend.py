@@ -1,21 +1,67 @@
+import hashlib
+from dataclasses import dataclass
+from email.utils import formatdate
+from pathlib import Path
+
 import anyio
-from litestar import Controller, MediaType, Response, get
-from litestar.status_codes import HTTP_200_OK
+from litestar import Controller, MediaType, Request, Response, get
+from litestar.exceptions import ServiceUnavailableException
+from litestar.status_codes import HTTP_200_OK, HTTP_304_NOT_MODIFIED
 
 from src.backend.settings import get_settings
 
+DEV_INDEX_PATH = Path("src/frontend/index.html")
+INDEX_PATH = Path("src/backend/web/static/index.html")
+
+
+@dataclass(frozen=True)
+class IndexHTML:
+    """Built index.html held in memory and served for every SPA route."""
+
+    content: bytes
+    etag: str
+    last_modified: str
+
+    @classmethod
+    def from_path(cls, path: Path) -> "IndexHTML":
+        content = path.read_bytes()
+        return cls(
+            content=content,
+            etag=f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+            last_modified=formatdate(path.stat().st_mtime, usegmt=True),
+        )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison.
+
+    Returns:
+        True if any listed tag (or ``*``) matches the ETag.
+
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
 
 class WebController(Controller):
     opt = {"exclude_from_auth": True}
     include_in_schema = False
 
     @get(["/", "/{path:path}"], operation_id="WebIndex", status_code=HTTP_200_OK)
-    async def index(self) -> Response[str]:
-        settings = get_settings()
+    async def index(self, request: Request) -> Response[bytes]:
+        # Read from disk in dev so frontend changes show up without a restart
+        if get_settings().debug:
+            async with await anyio.open_file(DEV_INDEX_PATH, "rb") as file:
+                return Response(content=await file.read(), status_code=HTTP_200_OK, media_type=MediaType.HTML)
 
-        file_path = (
-            anyio.Path("src/frontend/index.html") if settings.debug else anyio.Path("src/backend/web/static/index.html")
-        )
+        index_html: IndexHTML | None = request.app.state.get("index_html")
+        if index_html is None:
+            raise ServiceUnavailableException(detail="The frontend has not been built")
+
+        headers = {"ETag": index_html.etag, "Last-Modified": index_html.last_modified, "Cache-Control": "no-cache"}
+
+        if _etag_matches(request.headers.get("if-none-match", ""), index_html.etag):
+            return Response(content=b"", status_code=HTTP_304_NOT_MODIFIED, headers=headers)
 
-        async with await anyio.open_file(file_path) as file:
-            return Response(content=await file.read(), status_code=HTTP_200_OK, media_type=MediaType.HTML)
+        return Response(content=index_html.content, status_code=HTTP_200_OK, media_type=MediaType.HTML, headers=headers)
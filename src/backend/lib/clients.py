@@ -0,0 +1,173 @@
+import asyncio
+import contextlib
+from collections import Counter, OrderedDict
+from collections.abc import AsyncGenerator
+
+import httpx
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig, CrawlResult
+from google import genai
+from google.genai.client import AsyncClient
+
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=30)
+
+# Idle Gemini clients kept open for reuse, the least recently used are closed beyond this
+MAX_IDLE_GENAI_CLIENTS = 16
+
+# Gemini clients keyed by API key in least recently used order, shared across background tasks
+_genai_clients: OrderedDict[str, AsyncClient] = OrderedDict()
+_genai_client_users: Counter[AsyncClient] = Counter()
+_genai_clients_lock = asyncio.Lock()
+
+# crawl4ai crawler shared by all crawls, started on first use so a broken browser only fails crawls
+_web_crawler: AsyncWebCrawler | None = None
+_web_crawler_lock = asyncio.Lock()
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the shared HTTP client used for URL discovery.
+
+    Returns:
+        A pooled, keep-alive enabled HTTP client.
+
+    """
+    return httpx.AsyncClient(
+        headers=HTTP_HEADERS,
+        follow_redirects=True,
+        limits=HTTP_LIMITS,
+        http2=True,
+    )
+
+
+class OffloadedWebCrawler(AsyncWebCrawler):
+    """AsyncWebCrawler that runs HTML scraping and markdown generation in a worker thread.
+
+    crawl4ai does this CPU-bound work synchronously inside ``aprocess_html``,
+    which otherwise blocks the event loop for the whole conversion of every page.
+    """
+
+    async def aprocess_html(
+        self,
+        url: str,
+        html: str,
+        extracted_content: str,
+        config: CrawlerRunConfig,
+        screenshot_data: str,
+        pdf_data: str,
+        verbose: bool,
+        **kwargs: object,
+    ) -> CrawlResult:
+        # aprocess_html never awaits, so it can run to completion on a private loop in the thread
+        coro = super().aprocess_html(
+            url,
+            html,
+            extracted_content,
+            config,
+            screenshot_data,
+            pdf_data,
+            verbose,
+            **kwargs,
+        )
+        return await asyncio.to_thread(asyncio.run, coro)
+
+
+async def get_web_crawler() -> AsyncWebCrawler:
+    """Get the shared crawl4ai crawler used for content extraction, starting it on first use.
+
+    A crawler that fails to start is not kept, so the next crawl tries again.
+
+    Returns:
+        A started web crawler that keeps page processing off the event loop.
+
+    """
+    global _web_crawler  # noqa: PLW0603
+    async with _web_crawler_lock:
+        if _web_crawler is None:
+            web_crawler = OffloadedWebCrawler()
+            try:
+                await web_crawler.start()
+            except BaseException:
+                with contextlib.suppress(Exception):
+                    await web_crawler.close()
+                raise
+            _web_crawler = web_crawler
+        return _web_crawler
+
+
+async def close_web_crawler() -> None:
+    """Close the shared crawl4ai crawler if it was started."""
+    global _web_crawler  # noqa: PLW0603
+    async with _web_crawler_lock:
+        web_crawler = _web_crawler
+        _web_crawler = None
+
+    if web_crawler is not None:
+        await web_crawler.close()
+
+
+@contextlib.asynccontextmanager
+async def use_genai_client(api_key: str) -> AsyncGenerator[AsyncClient]:
+    """Borrow the cached Gemini client for the given API key, creating it on first use.
+
+    Clients stay cached while idle so later crawls with the same key reuse the
+    connection pool, up to MAX_IDLE_GENAI_CLIENTS.
+
+    Yields:
+        The async Gemini client for the API key.
+
+    """
+    async with _genai_clients_lock:
+        genai_client = _genai_clients.get(api_key)
+        if genai_client is None:
+            genai_client = _genai_clients[api_key] = genai.Client(api_key=api_key).aio
+        _genai_clients.move_to_end(api_key)
+        _genai_client_users[genai_client] += 1
+
+    try:
+        yield genai_client
+    finally:
+        async with _genai_clients_lock:
+            _genai_client_users[genai_client] -= 1
+            if not _genai_client_users[genai_client]:
+                del _genai_client_users[genai_client]
+            stale_clients = _pop_stale_genai_clients()
+
+            # Discarded clients are closed once their last user is done
+            if genai_client not in _genai_client_users and _genai_clients.get(api_key) is not genai_client:
+                stale_clients.append(genai_client)
+
+        for stale_client in stale_clients:
+            await stale_client.aclose()
+
+
+def _pop_stale_genai_clients() -> list[AsyncClient]:
+    """Remove the least recently used idle clients beyond MAX_IDLE_GENAI_CLIENTS.
+
+    Returns:
+        The removed clients, to be closed by the caller.
+
+    """
+    idle_keys = [key for key, genai_client in _genai_clients.items() if genai_client not in _genai_client_users]
+    return [_genai_clients.pop(key) for key in idle_keys[: max(len(idle_keys) - MAX_IDLE_GENAI_CLIENTS, 0)]]
+
+
+async def discard_genai_client(api_key: str) -> None:
+    """Drop the cached Gemini client for an API key, e.g. when the key is rejected.
+
+    A client still in use is closed when its last user releases it.
+    """
+    async with _genai_clients_lock:
+        genai_client = _genai_clients.pop(api_key, None)
+
+    if genai_client is not None and genai_client not in _genai_client_users:
+        await genai_client.aclose()
+
+
+async def close_genai_clients() -> None:
+    """Close and forget all cached Gemini clients."""
+    async with _genai_clients_lock:
+        genai_clients = list(_genai_clients.values())
+        _genai_clients.clear()
+
+    for genai_client in genai_clients:
+        await genai_client.aclose()
@@ -1,36 +1,50 @@
 import asyncio
-import json
+import contextlib
+import functools
 import logging
-import time
+import random
+import re
 from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
 from dataclasses import dataclass
-from pathlib import Path
 from typing import Any
-from urllib.parse import urljoin, urlparse, urlunparse
+from urllib.parse import ParseResult, urljoin, urlparse, urlunparse
 
-import anyio
 import httpx
-from advanced_alchemy.types import FileObject
-from bs4 import BeautifulSoup
+import msgspec
+import xxhash
 from crawl4ai import AsyncWebCrawler, CacheMode, CrawlerRunConfig, CrawlResult
 from crawl4ai.markdown_generation_strategy import DefaultMarkdownGenerator
 from google import genai
+from google.genai import errors as genai_errors
 from google.genai.client import AsyncClient
+from lxml import etree
 
-from src.backend.config import sqlalchemy_config
+from src.backend.config import settings, sqlalchemy_config
+from src.backend.lib.clients import discard_genai_client, get_web_crawler, use_genai_client
 from src.backend.lib.dependencies import provide_crawl_service
+from src.backend.lib.services import CrawlService
+from src.backend.lib.storage import StreamingUpload
 from src.backend.models import CrawlStatus
 from src.backend.schema.crawl import PostCrawl
 
 # Configuration constants
-MAX_CONCURRENT_CRAWL = 10
+MAX_CONCURRENT_CRAWL = settings.crawl.max_concurrent_requests
+MAX_CONCURRENT_AI_CALLS = settings.crawl.max_concurrent_ai_calls
+HTTP_TOO_MANY_REQUESTS = 429
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+FETCH_CHUNK_SIZE = 65536
 BATCH_SIZE = 10
+URL_BATCH_BUFFER_SIZE = 2
 CONTENT_PREVIEW_LENGTH = 10000
-LLM_TIMEOUT_SECONDS = 80
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Process-wide limits shared by every crawl background task
+_crawl_semaphore = asyncio.BoundedSemaphore(settings.crawl.max_concurrent_crawls)
+_ai_call_semaphore = asyncio.Semaphore(MAX_CONCURRENT_AI_CALLS)
+
 # File extensions to exclude from crawling
 EXCLUDED_EXTENSIONS = {
     ".png",
@@ -71,38 +85,23 @@ EXCLUDED_EXTENSIONS = {
     ".txt",
     ".csv",
 }
+EXCLUDED_EXTENSIONS_TUPLE = tuple(EXCLUDED_EXTENSIONS)
 CSS_SELECTOR = "main, sy-main, bd-main, .sy-main, .bd-main, article, .main, .content, .main-content, .article-content, .post-content, #main, #content, #main-content, .container .content, .page-content, .entry-content, [role='main']"  # noqa: E501
-EXCLUDED_TAGS = ["nav", "header", "footer", "aside", "sidebar"]
-
-
-@dataclass
-class RateLimitTracker:
-    """Tracks API rate limiting for LLM calls."""
+EXCLUDED_TAGS = frozenset({"nav", "header", "footer", "aside", "sidebar"})
 
-    api_calls_made: int = 0
-    last_reset_time: float = 0.0
+# Content extraction config shared by every crawl
+RUN_CONFIG = CrawlerRunConfig(
+    markdown_generator=DefaultMarkdownGenerator(),
+    cache_mode=CacheMode.DISABLED,
+    css_selector=CSS_SELECTOR,
+    excluded_tags=list(EXCLUDED_TAGS),
+)
 
-    def should_wait_for_rate_limit(self) -> tuple[bool, float]:
-        """Check if we should wait for rate limit reset.
+# Digits are stripped before hashing so dates, versions and counters don't defeat dedup
+DIGITS_RE = re.compile(r"\d+")
 
-        Returns:
-            Tuple of (should_wait, wait_time_seconds)
-
-        """
-        # Check if we've made 10 API calls and need to wait
-        if self.api_calls_made >= BATCH_SIZE:
-            return True, LLM_TIMEOUT_SECONDS
-
-        return False, 0.0
-
-    def reset(self) -> None:
-        """Reset rate limiting counters."""
-        self.api_calls_made = 0
-        self.last_reset_time = time.time()
-
-    def record_api_call(self) -> None:
-        """Record an API call."""
-        self.api_calls_made += 1
+# First path segments of common non-content paths
+SKIP_SEGMENTS = frozenset({"assets", "static", "images", "css", "js"})
 
 
 @dataclass
@@ -113,6 +112,17 @@ class PageContent:
     title: str
     description: str
     content: str
+    first_segment: str
+
+
+class AIPageMetadata(msgspec.Struct):
+    """Title and description generated by the LLM for a page."""
+
+    title: str = "Untitled"
+    description: str = "No description available"
+
+
+AI_RESPONSE_DECODER = msgspec.json.Decoder(AIPageMetadata)
 
 
 class WebsiteCrawler:
@@ -120,62 +130,74 @@ class WebsiteCrawler:
 
     def __init__(
         self,
+        client: httpx.AsyncClient,
         base_url: str,
         max_concurrent: int = MAX_CONCURRENT_CRAWL,
         url_filters: list[str] | None = None,
     ) -> None:
         """Initialize the website crawler."""
+        self.client = client
         self.base_url = base_url.rstrip("/")
         self.max_concurrent = max_concurrent
         self.url_filters = url_filters or []
+        self._filter_re = re.compile("|".join(map(re.escape, self.url_filters))) if self.url_filters else None
 
         # Parse base URL components
         parsed_base = urlparse(base_url)
         self.base_scheme = parsed_base.scheme
         self.base_netloc = parsed_base.netloc
         self.base_path = parsed_base.path.rstrip("/")
+        self.base_origin = f"{self.base_scheme}://{self.base_netloc}"
 
         # Storage for URLs
-        self.found_urls = set()
+        self.found_urls = {base_url}
         self.visited_urls = set()
         self.to_visit = deque([base_url])
 
         # Semaphore for controlling concurrent requests
         self.semaphore = asyncio.Semaphore(max_concurrent)
 
-    def is_valid_url(self, url: str) -> bool:
-        """Check if URL is valid for crawling.
+    def _is_valid_parsed(self, parsed: ParseResult) -> bool:
+        """Check if an already parsed URL is valid for crawling.
 
         Returns:
             True if the URL is valid for crawling, False otherwise.
 
         """
-        try:
-            parsed = urlparse(url)
-
-            # Check all validity conditions at once
-            return (
-                not parsed.fragment  # Skip URLs with fragments (hash/anchor)
-                and parsed.scheme == self.base_scheme  # Must be same scheme
-                and parsed.netloc == self.base_netloc  # Must be exact same netloc
-                and not any(
-                    parsed.path.lower().endswith(ext) for ext in EXCLUDED_EXTENSIONS
-                )  # Check excluded extensions
-                and parsed.path.startswith(self.base_path)  # Must start with base path
-                and not any(filter_pattern in parsed.path for filter_pattern in self.url_filters)  # Check filters
-            )
+        path = parsed.path
+
+        # Check all validity conditions at once
+        return (
+            parsed.scheme == self.base_scheme  # Must be same scheme
+            and parsed.netloc == self.base_netloc  # Must be exact same netloc
+            and not path.lower().endswith(EXCLUDED_EXTENSIONS_TUPLE)  # Check excluded extensions
+            and path.startswith(self.base_path)  # Must start with base path
+            and (self._filter_re is None or self._filter_re.search(path) is None)  # Check filters
+        )
 
-        except Exception:
-            return False
+    def resolve_url(self, href: str, current_url: str) -> str:
+        """Convert a link to an absolute URL, skipping urljoin for same-origin links.
 
-    def normalize_url(self, url: str) -> str:
-        """Normalize URL by removing fragments and ensuring consistent format.
+        Returns:
+            Absolute URL string
+
+        """
+        # Dot segments still need urljoin to be resolved
+        if "/." not in href:
+            if href.startswith("/") and not href.startswith("//"):
+                return self.base_origin + href
+            if href == self.base_origin or href.startswith(f"{self.base_origin}/"):
+                return href
+
+        return urljoin(current_url, href)
+
+    def normalize_url(self, parsed: ParseResult) -> str:
+        """Normalize a parsed URL by removing fragments and ensuring consistent format.
 
         Returns:
             Normalized URL string
 
         """
-        parsed = urlparse(url)
         # Remove fragment and reconstruct URL
         normalized = urlunparse(
             (
@@ -189,166 +211,353 @@ class WebsiteCrawler:
         )
         return normalized.rstrip("/")
 
-    def extract_links(self, html_content: str, current_url: str) -> list[str]:
-        """Extract all links from HTML content.
+    async def extract_links(self, response: httpx.Response, current_url: str) -> list[str]:
+        """Extract all links from a streamed HTML response.
+
+        The body is fed to an incremental parser chunk by chunk. Finished
+        elements are freed as it goes, so memory is bounded by how deeply the
+        page is nested rather than by its size.
 
         Returns:
             List of valid URLs found in the HTML
 
         """
-        soup = BeautifulSoup(html_content, "html.parser")
+        parser = etree.HTMLPullParser(events=("end",), encoding=response.charset_encoding)
+        links = []
+
+        async for chunk in response.aiter_bytes(FETCH_CHUNK_SIZE):
+            parser.feed(chunk)
+            links.extend(self._links_from_events(parser, current_url))
+
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            return links
+
+        links.extend(self._links_from_events(parser, current_url))
+        return links
+
+    def _links_from_events(self, parser: etree.HTMLPullParser, current_url: str) -> list[str]:
+        """Collect valid URLs from the anchors parsed so far.
+
+        Returns:
+            List of valid URLs from the pending parser events
+
+        """
         links = []
 
-        # Find all anchor tags with href attribute
-        for link in soup.find_all("a", href=True):
-            href = str(link["href"]).strip()
-            if not href:
+        for _, element in parser.read_events():
+            href = (element.get("href") or "").strip() if element.tag == "a" else ""
+
+            # Free finished elements as we go so the parser never holds the whole document tree
+            element.clear()
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+
+            if not href or href.startswith("#"):
                 continue
 
-            # Convert relative URLs to absolute
-            absolute_url = urljoin(current_url, href)
-            normalized_url = self.normalize_url(absolute_url)
+            # Convert relative URLs to absolute and parse them once, skipping malformed ones
+            try:
+                parsed = urlparse(self.resolve_url(href, current_url))
+            except ValueError:
+                continue
 
-            if self.is_valid_url(normalized_url):
-                links.append(normalized_url)
+            if self._is_valid_parsed(parsed):
+                links.append(self.normalize_url(parsed))
 
         return links
 
-    async def fetch_page(self, client: httpx.AsyncClient, url: str) -> tuple[str, str | None]:
-        """Fetch a web page asynchronously and return its content.
+    async def fetch_page(self, url: str) -> tuple[str, list[str] | None]:
+        """Fetch a web page asynchronously and extract its links while streaming.
 
         Returns:
-            Tuple of (url, html_content) where html_content is None if fetch failed.
+            Tuple of (url, links) where links is None if fetch failed.
 
         """
         async with self.semaphore:
             try:
-                response = await client.get(url, timeout=10.0)
-                response.raise_for_status()
+                async with self.client.stream("GET", url, timeout=10.0) as response:
+                    response.raise_for_status()
 
-                # Only process HTML content
-                content_type = response.headers.get("content-type", "").lower()
-                if "text/html" in content_type:
-                    return url, response.text
+                    # Only process HTML content
+                    content_type = response.headers.get("content-type", "").lower()
+                    if "text/html" in content_type:
+                        return url, await self.extract_links(response, url)
 
             except Exception as e:
                 logger.warning("Error fetching %s: %s", url, e)
 
         return url, None
 
-    async def crawl_batch(self, client: httpx.AsyncClient, urls: list[str]) -> dict[str, str | None]:
+    async def crawl_batch(self, urls: list[str]) -> dict[str, list[str] | None]:
         """Crawl a batch of URLs concurrently.
 
         Returns:
-            Dictionary mapping URLs to their HTML content (or None if failed).
+            Dictionary mapping URLs to their extracted links (or None if failed).
 
         """
-        tasks = [self.fetch_page(client, url) for url in urls]
+        tasks = [self.fetch_page(url) for url in urls]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         batch_results = {}
         for result in results:
             if isinstance(result, tuple):
-                url, content = result
-                batch_results[url] = content
+                url, links = result
+                batch_results[url] = links
             else:
                 logger.error("Error in batch: %s", result)
 
         return batch_results
 
-    async def crawl(self, max_pages: int | None = None) -> list[str]:
-        """Crawl the website and collect all valid URLs asynchronously.
+    async def crawl_stream(self, max_pages: int | None = None) -> AsyncIterator[list[str]]:
+        """Crawl the website, yielding newly discovered URLs after every batch.
 
-        Returns:
-            List of discovered URLs sorted alphabetically.
+        Each URL is yielded exactly once, starting with the base URL.
+
+        Yields:
+            List of URLs discovered by the latest batch.
 
         """
+        yield list(self.found_urls)
         pages_crawled = 0
 
-        async with httpx.AsyncClient(
-            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"},
-            follow_redirects=True,
-        ) as client:
-            while self.to_visit and (max_pages is None or pages_crawled < max_pages):
-                # Prepare batch of URLs to process
-                batch_urls = []
-                batch_size = min(self.max_concurrent, len(self.to_visit))
-
-                for _ in range(batch_size):
-                    if not self.to_visit:
-                        break
-                    url = self.to_visit.popleft()
-                    if url not in self.visited_urls:
-                        batch_urls.append(url)
-                        self.visited_urls.add(url)
-                        self.found_urls.add(url)
-
-                if not batch_urls:
+        while self.to_visit and (max_pages is None or pages_crawled < max_pages):
+            # Prepare batch of URLs to process
+            batch_urls = []
+            batch_size = min(self.max_concurrent, len(self.to_visit))
+
+            for _ in range(batch_size):
+                if not self.to_visit:
                     break
+                url = self.to_visit.popleft()
+                if url not in self.visited_urls:
+                    batch_urls.append(url)
+                    self.visited_urls.add(url)
+
+            if not batch_urls:
+                break
+
+            # Crawl batch concurrently
+            batch_results = await self.crawl_batch(batch_urls)
+
+            pages_crawled += len(batch_urls)
 
-                # Crawl batch concurrently
-                batch_results = await self.crawl_batch(client, batch_urls)
+            if new_urls := self._queue_new_links(batch_results):
+                yield new_urls
 
-                # Process results and extract new links
-                for url, html_content in batch_results.items():
-                    if html_content:
-                        links = self.extract_links(html_content, url)
+    def _queue_new_links(self, batch_results: dict[str, list[str] | None]) -> list[str]:
+        """Add links not seen before to the crawling queue.
 
-                        # Add new links to crawling queue
-                        for link in links:
-                            if link not in self.visited_urls and link not in list(self.to_visit):
-                                self.to_visit.append(link)
-                                self.found_urls.add(link)
-                    else:
-                        logger.warning("No HTML content for %s", url)
+        Returns:
+            List of newly discovered URLs.
 
-                pages_crawled += len(batch_urls)
+        """
+        new_urls = []
+        for url, links in batch_results.items():
+            if links is not None:
+                for link in links:
+                    if link not in self.found_urls:
+                        self.to_visit.append(link)
+                        self.found_urls.add(link)
+                        new_urls.append(link)
+            else:
+                logger.warning("No HTML content for %s", url)
 
-        # Return sorted list of unique URLs
-        return sorted(self.found_urls)
+        return new_urls
 
 
-async def _setup_output_files(domain: str, output_dir: Path) -> tuple[Path, Path]:
-    """Set up output files for llms.txt and llms-full.txt.
+async def _prefetch_url_batches(url_batches: AsyncIterator[list[str]]) -> AsyncGenerator[list[str]]:
+    """Run URL discovery in a background task, buffering a few batches ahead of the consumer.
 
-    Returns:
-        Tuple of (llms_path, llms_full_path)
+    Errors raised by URL discovery are re-raised to the consumer.
+
+    Yields:
+        URL batches in discovery order.
 
     """
-    # Create output directory if it doesn't exist
-    output_dir.mkdir(exist_ok=True)
+    queue: asyncio.Queue[list[str] | Exception | None] = asyncio.Queue(maxsize=URL_BATCH_BUFFER_SIZE)
 
-    # Generate filenames based on domain
-    base_filename = domain.replace(".", "_")
-    llms_filename = f"llms_{base_filename}.txt"
-    llms_full_filename = f"llms-full_{base_filename}.txt"
+    async def produce() -> None:
+        try:
+            async for url_batch in url_batches:
+                await queue.put(url_batch)
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (url_batch := await queue.get()) is not None:
+            if isinstance(url_batch, Exception):
+                raise url_batch
+            yield url_batch
+    finally:
+        producer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await producer
+
+
+def _setup_output_uploads(crawl_id: int) -> tuple[StreamingUpload, StreamingUpload]:
+    """Start streaming uploads for llms.txt and llms-full.txt.
+
+    Returns:
+        Tuple of (llms_upload, llms_full_upload)
+
+    """
+    llms_upload = StreamingUpload(backend="crawls", filename=f"{crawl_id}_llms.txt")
+    llms_full_upload = StreamingUpload(backend="crawls", filename=f"{crawl_id}_llms_full.txt")
+    return llms_upload, llms_full_upload
 
-    llms_path = output_dir / llms_filename
-    llms_full_path = output_dir / llms_full_filename
 
-    # Initialize files with headers
+async def _write_headers_to_uploads(
+    domain: str,
+    llms_upload: StreamingUpload,
+    llms_full_upload: StreamingUpload,
+) -> None:
+    """Write the llms.txt and llms-full.txt headers for the crawled domain."""
     title_parts = domain.replace("www.", "").split(".")
     title = " ".join(part.capitalize() for part in title_parts[:-1])  # Exclude TLD
 
-    # Write initial content to llms.txt
-    with llms_path.open("w", encoding="utf-8") as f:
-        f.write(f"# {title}\n\n")
-        f.write(f"> Documentation and content from {domain}\n\n")
-        f.write("## Documentation\n\n")
+    await llms_upload.write(
+        f"# {title}\n\n> Documentation and content from {domain}\n\n## Documentation\n\n".encode(),
+    )
+    await llms_full_upload.write(
+        f"# {title}\n\n> Complete documentation and content from {domain}\n\n## Documentation\n\n".encode(),
+    )
+
+
+def _retry_after_seconds(error: genai_errors.APIError) -> float | None:
+    """Read the Retry-After header from a Gemini API error response.
+
+    Returns:
+        The delay in seconds requested by the API, or None if not present.
+
+    """
+    headers = getattr(error.response, "headers", None)
+    retry_after = headers.get("retry-after") if headers else None
+    if retry_after is None:
+        return None
+
+    try:
+        return float(retry_after)
+    except ValueError:
+        return None
+
+
+def _is_retryable(error: genai_errors.APIError) -> bool:
+    """Check if a Gemini API error is transient (rate limited or server-side).
+
+    Returns:
+        True if the call should be retried, False otherwise.
+
+    """
+    return isinstance(error, genai_errors.ServerError) or error.code == HTTP_TOO_MANY_REQUESTS
+
 
-    # Write initial content to llms-full.txt
-    with llms_full_path.open("w", encoding="utf-8") as f:
-        f.write(f"# {title}\n\n")
-        f.write(f"> Complete documentation and content from {domain}\n\n")
-        f.write("## Documentation\n\n")
+def retry_with_exponential_backoff[**P, T](
+    base: float = 1.0,
+    factor: float = 2.0,
+    max_delay: float = 60.0,
+    max_retries: int = 5,
+    jitter: bool = True,
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """Retry an async Gemini call on rate limit and server errors with exponential backoff.
 
-    return llms_path, llms_full_path
+    The Retry-After header is honoured when the API sends one.
+
+    Returns:
+        Decorator wrapping the async function with retries.
+
+    """
+
+    def decorator(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            attempt = 0
+            while True:
+                try:
+                    return await func(*args, **kwargs)
+                except genai_errors.APIError as e:
+                    if attempt >= max_retries or not _is_retryable(e):
+                        raise
+
+                    delay = _retry_after_seconds(e)
+                    if delay is None:
+                        delay = base * factor**attempt + (random.uniform(0, 1) if jitter else 0)  # noqa: S311
+                    delay = min(delay, max_delay)
+
+                    attempt += 1
+                    logger.info("Gemini call failed (%s), retry %d/%d in %.1fs", e.code, attempt, max_retries, delay)
+                    await asyncio.sleep(delay)
+
+        return wrapper
+
+    return decorator
+
+
+@retry_with_exponential_backoff(base=1, factor=2, max_delay=60, max_retries=5, jitter=True)
+async def _generate_content(genai_client: AsyncClient, prompt: str) -> genai.types.GenerateContentResponse:
+    """Generate a page title and description with Gemini.
+
+    Returns:
+        The raw Gemini response.
+
+    """
+    return await genai_client.models.generate_content(
+        model=GEMINI_MODEL,
+        contents=prompt,
+        config=genai.types.GenerateContentConfig(
+            system_instruction="You are a helpful assistant that generates concise, accurate titles and descriptions for web pages. Always respond with valid JSON.",  # noqa: E501
+        ),
+    )
+
+
+def _first_path_segment(url: str) -> str:
+    """Get the lowercased first path segment of an absolute URL without a full parse.
+
+    Returns:
+        First path segment, or an empty string if the URL has no path.
+
+    """
+    parts = url.split("/", 4)
+    return parts[3].partition("?")[0].lower() if len(parts) > 3 else ""  # noqa: PLR2004
+
+
+def _content_digest(markdown: str) -> int:
+    """Hash page content with digits stripped to detect near-duplicate pages.
+
+    Returns:
+        64-bit digest of the normalized content.
+
+    """
+    return xxhash.xxh3_64_intdigest(DIGITS_RE.sub("", markdown))
+
+
+async def _is_valid_api_key(genai_client: AsyncClient) -> bool:
+    """Check the Gemini API key with a cheap model metadata lookup.
+
+    Returns:
+        True if the API key is accepted, False if Gemini rejects it.
+
+    """
+    try:
+        await genai_client.models.get(model=GEMINI_MODEL)
+    except genai_errors.ClientError as e:
+        if e.code == HTTP_TOO_MANY_REQUESTS:
+            return True
+        logger.warning("Gemini API key rejected: %s", e)
+        return False
+    return True
 
 
 async def _process_content_with_ai(
     result: CrawlResult,
     genai_client: AsyncClient,
-    rate_limiter: RateLimitTracker,
+    seen_digests: set[int],
 ) -> PageContent | None:
     """Process a single crawl result with AI to generate title and description.
 
@@ -363,12 +572,14 @@ async def _process_content_with_ai(
         logger.warning("Failed to crawl: %s", result.url)
         return None
 
-    # Check rate limits before making API call
-    should_wait, wait_time = rate_limiter.should_wait_for_rate_limit()
-    if should_wait:
-        logger.info("Rate limit reached (10 calls), waiting %d seconds...", int(wait_time))
-        await asyncio.sleep(wait_time)
-        rate_limiter.reset()
+    # Skip mirrored or versioned copies of pages we've already processed
+    digest = _content_digest(result.markdown)
+    if digest in seen_digests:
+        logger.info("Skipping duplicate content: %s", result.url)
+        return None
+    seen_digests.add(digest)
+
+    first_segment = _first_path_segment(result.url)
 
     prompt = f"""Generate a concise title and description for this web page that would help users find relevant information.
 
@@ -384,16 +595,7 @@ Page content:
 """  # noqa: E501
 
     try:
-        response = await genai_client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=prompt,
-            config=genai.types.GenerateContentConfig(
-                system_instruction="You are a helpful assistant that generates concise, accurate titles and descriptions for web pages. Always respond with valid JSON.",  # noqa: E501
-            ),
-        )
-
-        # Record the API call
-        rate_limiter.record_api_call()
+        response = await _generate_content(genai_client, prompt)
 
         # Parse AI response
         if not response.text:
@@ -401,13 +603,14 @@ Page content:
 
         ai_text = response.text.strip()
         ai_text = ai_text.removeprefix("```json").removesuffix("```")
-        ai_data = json.loads(ai_text.strip())
+        ai_data = AI_RESPONSE_DECODER.decode(ai_text.strip())
 
         return PageContent(
             url=result.url,
-            title=ai_data.get("title", "Untitled"),
-            description=ai_data.get("description", "No description available"),
+            title=ai_data.title,
+            description=ai_data.description,
             content=result.markdown,
+            first_segment=first_segment,
         )
 
     except Exception as e:
@@ -418,15 +621,16 @@ Page content:
             title=f"Page from {urlparse(result.url).path}",
             description="Content from discovered page",
             content=result.markdown,
+            first_segment=first_segment,
         )
 
 
-async def _write_batch_to_files(
+async def _write_batch_to_uploads(
     batch_content: list[PageContent],
-    llms_path: Path,
-    llms_full_path: Path,
+    llms_upload: StreamingUpload,
+    llms_full_upload: StreamingUpload,
 ) -> int:
-    """Write a batch of content to output files.
+    """Append a batch of content to the output uploads.
 
     Returns:
         Number of items written
@@ -436,170 +640,174 @@ async def _write_batch_to_files(
         return 0
 
     # Filter out non-content paths
-    filtered_content = []
-    for item in batch_content:
-        path = urlparse(item.url).path.strip("/")
-        first_segment = path.split("/")[0] if path else ""
-
-        # Skip common non-content paths
-        if first_segment.lower() not in {"assets", "static", "images", "css", "js"}:
-            filtered_content.append(item)
+    filtered_content = [item for item in batch_content if item.first_segment not in SKIP_SEGMENTS]
+    if not filtered_content:
+        return 0
 
-    # Append to llms.txt (navigation format)
-    with llms_path.open("a", encoding="utf-8") as f:
-        for item in filtered_content:
-            f.write(f"- [{item.title}]({item.url}): {item.description}\n")
+    # Append to llms.txt (navigation format), one chunk per batch
+    await llms_upload.write(
+        "".join(f"- [{item.title}]({item.url}): {item.description}\n" for item in filtered_content).encode(),
+    )
 
     # Append to llms-full.txt (full content format)
-    with llms_full_path.open("a", encoding="utf-8") as f:
-        for item in filtered_content:
-            f.write(f"### {item.title}\n")
-            f.write(f"Source: {item.url}\n\n")
-            f.write(f"{item.content}\n\n")
+    await llms_full_upload.write(
+        "".join(f"### {item.title}\nSource: {item.url}\n\n{item.content}\n\n" for item in filtered_content).encode(),
+    )
 
     return len(filtered_content)
 
 
-async def process_website_crawl(data: PostCrawl, crawl_id: int) -> None:
+async def process_website_crawl(
+    data: PostCrawl,
+    crawl_id: int,
+    http_client: httpx.AsyncClient,
+) -> None:
     """Crawl background task that combines URL discovery with content extraction and AI processing.
 
     This function:
-    1. Discovers all URLs from the given website
-    2. Extracts content from each URL using crawl4ai
-    3. Generates AI-powered titles and descriptions
-    4. Creates an llms.txt file with organized content
+    1. Checks the Gemini API key, failing the crawl if it is rejected
+    2. Discovers URLs from the given website in the background
+    3. Extracts content from each URL using crawl4ai as soon as it is discovered
+    4. Generates AI-powered titles and descriptions
+    5. Creates an llms.txt file with organized content
     """
-    try:
-        # Step 1: Discover all URLs from the website
-        crawler = WebsiteCrawler(
-            data.website_url,
-            max_concurrent=MAX_CONCURRENT_CRAWL,
-            url_filters=data.url_filters,
-        )
-        discovered_urls = await crawler.crawl()
-
-        if not discovered_urls:
-            logger.warning("No URLs discovered for: %s", data.website_url)
-            return
-
-        async with sqlalchemy_config.get_session() as db_session:
-            crawl_service = await anext(provide_crawl_service(db_session))
-            await crawl_service.update(
-                item_id=crawl_id,
-                data={"pages": len(discovered_urls), "status": CrawlStatus.IN_PROGRESS},
-                auto_commit=True,
-            )
+    async with _crawl_semaphore, sqlalchemy_config.get_session() as db_session:
+        crawl_service = await anext(provide_crawl_service(db_session))
 
-        # Step 2: Setup for content extraction
-        genai_client = genai.Client(api_key=data.gemini_api_key).aio
-        rate_limiter = RateLimitTracker()
-        rate_limiter.reset()
-
-        # Setup output files
-        domain = urlparse(data.website_url).netloc
-        output_dir = Path("output")
-        llms_path, llms_full_path = await _setup_output_files(domain, output_dir)
-
-        # Step 3: Process URLs in batches
-        await _process_urls_in_batches(
-            discovered_urls,
-            genai_client,
-            rate_limiter,
-            llms_path,
-            llms_full_path,
-        )
-
-        await genai_client.aclose()
-
-        # Step 4: Mark crawl as completed
-        updated_data: dict[str, Any] = {"status": CrawlStatus.COMPLETED}
-
-        async with await anyio.open_file(llms_path, encoding="utf-8") as f:
-            content = await f.read()
-
-            updated_data["llms"] = FileObject(
-                backend="crawls",
-                filename=f"{crawl_id}_llms.txt",
-                content=content.encode("utf-8"),
-            )
-
-        async with await anyio.open_file(llms_full_path, encoding="utf-8") as f:
-            content = await f.read()
+        try:
+            async with use_genai_client(data.gemini_api_key) as genai_client:
+                # Step 1: Check the API key before doing any crawling
+                if not await _is_valid_api_key(genai_client):
+                    # Don't keep a client around for a key that will never work
+                    await discard_genai_client(data.gemini_api_key)
+                    await crawl_service.update(
+                        item_id=crawl_id,
+                        data={"status": CrawlStatus.FAILED, "meta": {"error": "invalid_api_key"}},
+                        auto_commit=True,
+                    )
+                    return
+
+                await crawl_service.update(
+                    item_id=crawl_id,
+                    data={"status": CrawlStatus.IN_PROGRESS},
+                    auto_commit=True,
+                )
 
-            updated_data["llms_full"] = FileObject(
-                backend="crawls",
-                filename=f"{crawl_id}_llms_full.txt",
-                content=content.encode("utf-8"),
-            )
+                # Fails the crawl if the browser can't be started
+                web_crawler = await get_web_crawler()
+
+                async def update_pages(pages: int) -> None:
+                    await crawl_service.update(item_id=crawl_id, data={"pages": pages}, auto_commit=True)
+
+                # Step 2: Setup output uploads
+                llms_upload, llms_full_upload = _setup_output_uploads(crawl_id)
+
+                try:
+                    await _write_headers_to_uploads(urlparse(data.website_url).netloc, llms_upload, llms_full_upload)
+
+                    # Step 3: Discover URLs in the background while processing them in batches
+                    crawler = WebsiteCrawler(
+                        http_client,
+                        data.website_url,
+                        max_concurrent=MAX_CONCURRENT_CRAWL,
+                        url_filters=data.url_filters,
+                    )
+                    # Closing the stream stops background discovery if processing fails
+                    async with contextlib.aclosing(_prefetch_url_batches(crawler.crawl_stream())) as url_batches:
+                        await _process_urls_in_batches(
+                            url_batches,
+                            web_crawler,
+                            genai_client,
+                            llms_upload,
+                            llms_full_upload,
+                            update_pages,
+                        )
+
+                    # Step 4: Finish uploads and mark crawl as completed
+                    updated_data: dict[str, Any] = {
+                        "status": CrawlStatus.COMPLETED,
+                        "llms": await llms_upload.close(),
+                        "llms_full": await llms_full_upload.close(),
+                    }
+                except BaseException:
+                    await llms_upload.abort()
+                    await llms_full_upload.abort()
+                    raise
+
+                await crawl_service.update(item_id=crawl_id, data=updated_data, auto_commit=True)
 
-        async with sqlalchemy_config.get_session() as db_session:
-            crawl_service = await anext(provide_crawl_service(db_session))
-            await crawl_service.update(item_id=crawl_id, data=updated_data, auto_commit=True)
+        except Exception:
+            logger.exception("Error in process_website_crawl")
+            await _mark_crawl_failed(crawl_service, crawl_id)
 
-        # Clean up output files
-        try:
-            llms_path.unlink(missing_ok=True)
-            llms_full_path.unlink(missing_ok=True)
-        except Exception as e:
-            logger.warning("Failed to delete output files: %s", e)
 
+async def _mark_crawl_failed(crawl_service: CrawlService, crawl_id: int) -> None:
+    """Mark a crawl as failed, falling back to a fresh session if the current one is unusable."""
+    try:
+        await crawl_service.repository.session.rollback()
+        await crawl_service.update(item_id=crawl_id, data={"status": CrawlStatus.FAILED}, auto_commit=True)
     except Exception:
-        logger.exception("Error in process_website_crawl")
+        logger.exception("Failed to mark crawl %d as failed, retrying with a new session", crawl_id)
         async with sqlalchemy_config.get_session() as db_session:
-            crawl_service = await anext(provide_crawl_service(db_session))
-            await crawl_service.update(item_id=crawl_id, data={"status": CrawlStatus.FAILED}, auto_commit=True)
+            recovery_service = await anext(provide_crawl_service(db_session))
+            await recovery_service.update(item_id=crawl_id, data={"status": CrawlStatus.FAILED}, auto_commit=True)
 
 
 async def _process_urls_in_batches(
-    discovered_urls: list[str],
+    url_batches: AsyncIterator[list[str]],
+    web_crawler: AsyncWebCrawler,
     genai_client: AsyncClient,
-    rate_limiter: RateLimitTracker,
-    llms_path: Path,
-    llms_full_path: Path,
+    llms_upload: StreamingUpload,
+    llms_full_upload: StreamingUpload,
+    update_pages: Callable[[int], Awaitable[None]],
 ) -> None:
-    """Process discovered URLs in batches with rate limiting."""
-    run_config = CrawlerRunConfig(
-        markdown_generator=DefaultMarkdownGenerator(),
-        cache_mode=CacheMode.DISABLED,
-        css_selector=CSS_SELECTOR,
-        excluded_tags=EXCLUDED_TAGS,
-    )
-
+    """Process URLs in batches as they are discovered."""
     total_processed = 0
+    total_discovered = 0
+    seen_digests: set[int] = set()
+    pending_urls: list[str] = []
+
+    async def process_batch(batch_urls: list[str]) -> int:
+        try:
+            results: list[CrawlResult] = await web_crawler.arun_many(
+                urls=batch_urls,
+                config=RUN_CONFIG,
+            )  # pyright: ignore[reportAssignmentType]
+
+            # Process batch content with AI
+            batch_content = await _process_batch_with_ai(
+                results,
+                genai_client,
+                seen_digests,
+            )
+        except Exception:
+            logger.exception("Batch processing cancelled")
+            return 0
+
+        # Upload errors are not caught here so a failed upload aborts the crawl right away
+        return await _write_batch_to_uploads(
+            batch_content,
+            llms_upload,
+            llms_full_upload,
+        )
 
-    async with AsyncWebCrawler() as web_crawler:
-        for i in range(0, len(discovered_urls), BATCH_SIZE):
-            batch_urls = discovered_urls[i : i + BATCH_SIZE]
+    async for url_batch in url_batches:
+        total_discovered += len(url_batch)
+        await update_pages(total_discovered)
 
-            try:
-                results: list[CrawlResult] = await web_crawler.arun_many(
-                    urls=batch_urls,
-                    config=run_config,
-                )  # pyright: ignore[reportAssignmentType]
-
-                # Process batch content with AI
-                batch_content = await _process_batch_with_ai(
-                    results,
-                    genai_client,
-                    rate_limiter,
-                )
+        pending_urls.extend(url_batch)
+        while len(pending_urls) >= BATCH_SIZE:
+            total_processed += await process_batch(pending_urls[:BATCH_SIZE])
+            del pending_urls[:BATCH_SIZE]
 
-                # Write batch to files
-                written_count = await _write_batch_to_files(
-                    batch_content,
-                    llms_path,
-                    llms_full_path,
-                )
-                total_processed += written_count
-            except Exception:
-                logger.exception("Batch processing cancelled")
-                continue
+    if pending_urls:
+        total_processed += await process_batch(pending_urls)
 
 
 async def _process_batch_with_ai(
     results: list[CrawlResult],
     genai_client: AsyncClient,
-    rate_limiter: RateLimitTracker,
+    seen_digests: set[int],
 ) -> list[PageContent]:
     """Process a batch of crawl results with AI enhancement.
 
@@ -607,11 +815,18 @@ async def _process_batch_with_ai(
         List of processed PageContent objects
 
     """
-    batch_content = []
 
-    for result in results:
-        page_content = await _process_content_with_ai(result, genai_client, rate_limiter)
-        if page_content:
+    async def process_result(result: CrawlResult) -> PageContent | None:
+        async with _ai_call_semaphore:
+            return await _process_content_with_ai(result, genai_client, seen_digests)
+
+    page_contents = await asyncio.gather(*(process_result(result) for result in results), return_exceptions=True)
+
+    batch_content = []
+    for page_content in page_contents:
+        if isinstance(page_content, BaseException):
+            logger.error("Error processing content with AI: %s", page_content)
+        elif page_content:
             batch_content.append(page_content)
 
     return batch_content
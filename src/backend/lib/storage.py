@@ -0,0 +1,71 @@
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+
+from advanced_alchemy.types import FileObject
+
+# Chunks waiting for the upload before writers are made to wait
+MAX_PENDING_CHUNKS = 8
+
+
+class StreamingUpload:
+    """Uploads a file to its storage backend while the content is still being written.
+
+    Chunks are handed to a multipart upload as they arrive. The queue in
+    between is bounded, so writers wait when the backend falls behind
+    instead of buffering the whole file.
+    """
+
+    def __init__(self, backend: str, filename: str) -> None:
+        self.file_object = FileObject(backend=backend, filename=filename)
+        self._chunks: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=MAX_PENDING_CHUNKS)
+        self._upload = asyncio.create_task(self.file_object.save_async(self._iter_chunks(), use_multipart=True))
+
+    async def _iter_chunks(self) -> AsyncIterator[bytes]:
+        while (chunk := await self._chunks.get()) is not None:
+            yield chunk
+
+    async def _put(self, item: bytes | None) -> bool:
+        """Queue an item, waiting for space unless the upload stops first.
+
+        Returns:
+            True if the item was queued, False if the upload is no longer running.
+
+        """
+        if self._upload.done():
+            return False
+
+        put = asyncio.ensure_future(self._chunks.put(item))
+        try:
+            await asyncio.wait({put, self._upload}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not put.done():
+                put.cancel()
+        return put.done() and not put.cancelled()
+
+    async def write(self, data: bytes) -> None:
+        """Queue data for upload, waiting while the queue is full.
+
+        Raises:
+            RuntimeError: If the upload has already stopped.
+
+        """
+        if not await self._put(data):
+            error = None if self._upload.cancelled() else self._upload.exception()
+            raise RuntimeError("Upload is no longer running") from error
+
+    async def close(self) -> FileObject:
+        """Finish the upload and wait for it to complete.
+
+        Returns:
+            The saved FileObject.
+
+        """
+        await self._put(None)
+        return await self._upload
+
+    async def abort(self) -> None:
+        """Cancel the upload without committing the file."""
+        self._upload.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await self._upload
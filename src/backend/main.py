@@ -1,3 +1,6 @@
+import contextlib
+import logging
+
 from advanced_alchemy.exceptions import RepositoryError
 from litestar import Litestar
 from litestar.exceptions import ClientException, NotAuthorizedException, NotFoundException
@@ -7,8 +10,32 @@ from litestar.openapi.plugins import ScalarRenderPlugin
 
 from src.backend.config import alchemy_plugin, settings, vite_plugin
 from src.backend.controllers import CrawlController, WebController
+from src.backend.controllers.frontend import INDEX_PATH, IndexHTML
+from src.backend.lib.clients import close_genai_clients, close_web_crawler, create_http_client
 from src.backend.lib.utils import exception_handler
 
+logger = logging.getLogger(__name__)
+
+
+def on_startup(app: Litestar) -> None:
+    app.state.http_client = create_http_client()
+
+    if not settings.debug:
+        # A missing build only breaks the web UI, the API still starts
+        try:
+            app.state.index_html = IndexHTML.from_path(INDEX_PATH)
+        except FileNotFoundError:
+            logger.warning("%s not found, build the frontend to serve the web UI", INDEX_PATH)
+
+
+async def on_shutdown(app: Litestar) -> None:
+    # Callbacks run in reverse order, and every one runs even if an earlier one fails
+    async with contextlib.AsyncExitStack() as stack:
+        stack.push_async_callback(close_genai_clients)
+        stack.push_async_callback(app.state.http_client.aclose)
+        stack.push_async_callback(close_web_crawler)
+
+
 app = Litestar(
     debug=settings.debug,
     route_handlers=[
@@ -43,4 +70,6 @@ app = Litestar(
         Exception: exception_handler,
         RepositoryError: exception_handler,
     },
+    on_startup=[on_startup],
+    on_shutdown=[on_shutdown],
 )
@@ -1,6 +1,5 @@
 from datetime import datetime
 
-from google import genai
 from msgspec import Struct
 
 
@@ -9,18 +8,6 @@ class PostCrawl(Struct):
     gemini_api_key: str
     url_filters: list[str] | None = None
 
-    async def validate_api_key(self) -> bool:
-        try:
-            genai_client = genai.Client(api_key=self.gemini_api_key).aio
-            _ = await genai_client.models.generate_content(
-                model="gemini-2.5-flash-lite",
-                contents="Test",
-            )
-            await genai_client.aclose()
-        except Exception:
-            return False
-        return True
-
 
 class Crawl(Struct):
     id: int
@@ -1,69 +1,138 @@
 import os
-from dataclasses import dataclass, field
-from functools import lru_cache
+from dataclasses import dataclass, field, fields
+from functools import cache, partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from advanced_alchemy.types import storages
-from advanced_alchemy.types.file_object.backends.obstore import ObstoreBackend
-from rich import get_console
+if TYPE_CHECKING:
+    from rich.console import Console
 
-console = get_console()
+try:
+    from dotenv import dotenv_values
+except ImportError:  # pragma: no cover
+    dotenv_values = None  # pyright: ignore[reportAssignmentType]
 
+_BACKEND_DIR = Path(__file__).resolve().parent
+_PKG_ROOT = _BACKEND_DIR.parent
 
-@dataclass
+_TRUTHY = frozenset({"true", "1", "yes"})
+
+# Snapshot of the process environment, refreshed in place after a .env file is loaded
+_ENV: dict[str, str] = dict(os.environ)
+
+# .env files already loaded into the environment, mapped to whether they were loaded with override
+_DOTENV_LOADED: dict[str, bool] = {}
+
+# Variables set from .env files, mapped to the value they replaced so a reload can undo them
+_DOTENV_VARS: dict[str, str | None] = {}
+
+
+@cache
+def _console() -> "Console":
+    from rich import get_console
+
+    return get_console()
+
+
+def _env_str(key: str, default: str) -> str:
+    return _ENV.get(key, default)
+
+
+def _env_bool(key: str, default: str) -> bool:
+    return _ENV.get(key, default).lower() in _TRUTHY
+
+
+def _env_int(key: str, default: str) -> int:
+    value = _ENV.get(key, default)
+    try:
+        return int(value)
+    except ValueError:
+        msg = f"{key} environment variable must be an integer, got {value!r}"
+        raise ValueError(msg) from None
+
+
+@dataclass(slots=True)
 class ViteSettings:
     use_server_lifespan: bool = field(
-        default_factory=lambda: os.getenv("VITE_USE_SERVER_LIFESPAN", "false").lower() in {"true", "1", "yes"},
+        default_factory=partial(_env_bool, "VITE_USE_SERVER_LIFESPAN", "false"),
     )
     host: str = field(
-        default_factory=lambda: os.getenv("VITE_HOST", "0.0.0.0"),  # noqa: S104
+        default_factory=partial(_env_str, "VITE_HOST", "0.0.0.0"),  # noqa: S104
     )
     port: int = field(
-        default_factory=lambda: int(os.getenv("VITE_PORT", "8080")),
+        default_factory=partial(_env_int, "VITE_PORT", "8080"),
     )
     hot_reload: bool = field(
-        default_factory=lambda: os.getenv("VITE_HOT_RELOAD", "false").lower() in {"true", "1", "yes"},
+        default_factory=partial(_env_bool, "VITE_HOT_RELOAD", "false"),
     )
     asset_url: str = field(
-        default_factory=lambda: os.getenv("ASSET_URL", "/static/"),
+        default_factory=partial(_env_str, "ASSET_URL", "/static/"),
     )
     is_react: bool = True
-    root_dir: Path = Path(__file__).parent.parent / "frontend"
-    resource_dir: Path = Path(__file__).parent.parent / "frontend" / "src"
-    bundle_dir: Path = Path(__file__).parent / "web" / "static"
+    root_dir: Path = _PKG_ROOT / "frontend"
+    resource_dir: Path = _PKG_ROOT / "frontend" / "src"
+    bundle_dir: Path = _BACKEND_DIR / "web" / "static"
 
 
-@dataclass
+@dataclass(slots=True)
 class BlobSettings:
     bucket_name: str = field(
-        default_factory=lambda: os.getenv("BUCKET_NAME", "mybucket"),
+        default_factory=partial(_env_str, "BUCKET_NAME", "mybucket"),
     )
     endpoint: str = field(
-        default_factory=lambda: os.getenv("ENDPOINT", "http://localhost:9000"),
+        default_factory=partial(_env_str, "ENDPOINT", "http://localhost:9000"),
     )
     access_key_id: str = field(
-        default_factory=lambda: os.getenv("ACCESS_KEY_ID", "minioadmin"),
+        default_factory=partial(_env_str, "ACCESS_KEY_ID", "minioadmin"),
     )
     secret_access_key: str = field(
-        default_factory=lambda: os.getenv("SECRET_ACCESS_KEY", "minioadmin"),
+        default_factory=partial(_env_str, "SECRET_ACCESS_KEY", "minioadmin"),
+    )
+
+
+@dataclass(slots=True)
+class CrawlSettings:
+    max_concurrent_crawls: int = field(
+        default_factory=partial(_env_int, "MAX_CONCURRENT_CRAWLS", "3"),
+    )
+    max_concurrent_requests: int = field(
+        default_factory=partial(_env_int, "MAX_CONCURRENT_REQUESTS", "10"),
+    )
+    max_concurrent_ai_calls: int = field(
+        default_factory=partial(_env_int, "MAX_CONCURRENT_AI_CALLS", "10"),
     )
 
+    def __post_init__(self):
+        # A limit of 0 would make every crawl wait on its semaphore forever; field names match their env vars
+        for crawl_field in fields(self):
+            value = getattr(self, crawl_field.name)
+            if value < 1:
+                msg = f"{crawl_field.name.upper()} environment variable must be at least 1, got {value}"
+                raise ValueError(msg)
+
 
-@dataclass
+@dataclass(slots=True)
 class Settings:
     debug: bool = field(
-        default_factory=lambda: os.getenv("DEBUG", "false").lower() in {"true", "1", "yes"},
+        default_factory=partial(_env_bool, "DEBUG", "false"),
     )
     db_connection_string: str | None = field(
-        default_factory=lambda: os.getenv("DB_CONNECTION_STRING"),
+        default_factory=partial(_ENV.get, "DB_CONNECTION_STRING"),
     )
     vite: ViteSettings = field(default_factory=ViteSettings)
     blob: BlobSettings = field(default_factory=BlobSettings)
+    crawl: CrawlSettings = field(default_factory=CrawlSettings)
 
     def __post_init__(self):
         if not self.db_connection_string:
             raise ValueError("DB_CONNECTION_STRING environment variable is required")
 
+    def register_storage(self) -> None:
+        """Register the blob storage backend used for crawl files."""
+        # Imported here so importing settings doesn't pull in the storage stack
+        from advanced_alchemy.types import storages
+        from advanced_alchemy.types.file_object.backends.obstore import ObstoreBackend
+
         storages.register_backend(
             ObstoreBackend(
                 key="crawls",
@@ -77,23 +146,61 @@ class Settings:
         )
 
     @classmethod
-    def from_env(cls, dotenv_filename: str) -> "Settings":
-        env_file = (
-            Path(dotenv_filename) if Path(dotenv_filename).is_absolute() else Path(f"{os.curdir}/{dotenv_filename}")
-        )
+    def from_env(cls, dotenv_filename: str, override: bool = False) -> "Settings":
+        env_file = os.path.abspath(dotenv_filename)  # noqa: PTH100
 
-        if env_file.is_file():
-            from dotenv import load_dotenv
+        # Skip files already applied, unless they were loaded without the override now asked for
+        already_loaded = env_file in _DOTENV_LOADED and (_DOTENV_LOADED[env_file] or not override)
 
-            console.print(
+        if dotenv_values is not None and not already_loaded and os.path.isfile(env_file):  # noqa: PTH113
+            _console().print(
                 f"[yellow]Loading environment configuration from {dotenv_filename}[/]",
                 markup=True,
             )
 
-            load_dotenv(env_file, override=True)
+            for key, value in dotenv_values(env_file).items():
+                # Variables already set in the environment take precedence unless override is requested
+                if value is None or (key in os.environ and not override):
+                    continue
+                _DOTENV_VARS.setdefault(key, os.environ.get(key))
+                os.environ[key] = value
+            _DOTENV_LOADED[env_file] = override
+            _ENV.update(os.environ)
         return Settings()
 
 
-@lru_cache(maxsize=1, typed=True)
+# The singleton keeps the registered storage backend alive; reload_settings() replaces both
+_settings: Settings | None = None
+
+
 def get_settings() -> Settings:
-    return Settings.from_env(dotenv_filename=".env")
+    global _settings  # noqa: PLW0603
+    if _settings is None:
+        _settings = Settings.from_env(dotenv_filename=".env")
+        _settings.register_storage()
+    return _settings
+
+
+def reload_settings() -> Settings:
+    """Rebuild the settings singleton from the current environment and .env file.
+
+    Modules that bound the settings at import time keep the previous instance.
+
+    Returns:
+        The newly built settings.
+
+    """
+    global _settings  # noqa: PLW0603
+    _settings = None
+
+    # Undo what earlier .env loads set, so edited or removed entries take effect
+    for key, previous in _DOTENV_VARS.items():
+        if previous is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = previous
+    _DOTENV_VARS.clear()
+    _DOTENV_LOADED.clear()
+    _ENV.clear()
+    _ENV.update(os.environ)
+    return get_settings()
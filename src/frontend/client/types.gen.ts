@@ -96,9 +96,9 @@ export type ApiCrawlCreateCrawlError = ApiCrawlCreateCrawlErrors[keyof ApiCrawlC
 
 export type ApiCrawlCreateCrawlResponses = {
     /**
-     * Document created, URL follows
+     * Request accepted, processing begins
      */
-    201: Crawl;
+    202: Crawl;
 };
 
 export type ApiCrawlCreateCrawlResponse = ApiCrawlCreateCrawlResponses[keyof ApiCrawlCreateCrawlResponses];